@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark load/save speed and file size of the price history for every
+available JSON codec and storage format
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import storage
+
+
+def available_backends():
+    """List the JSON codecs importable in this environment"""
+    backends = ["json"]
+    if storage.msgspec is not None:
+        backends.append("msgspec")
+    if storage.orjson is not None:
+        backends.append("orjson")
+    return backends
+
+
+def available_formats():
+    """List (label, compact, compression) storage formats to benchmark"""
+    formats = [
+        ("pretty", False, "none"),
+        ("compact", True, "none"),
+        ("compact+gzip", True, "gzip"),
+    ]
+    if storage.zstd is not None:
+        formats.append(("compact+zstd", True, "zstd"))
+    return formats
+
+
+def best_of(func, repeat):
+    """Return the fastest wall-clock time of several runs in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def run_benchmark(history_file="data/price_history.json", repeat=5):
+    """Print a table of save/load timings and sizes"""
+    original_backend = storage.JSON_BACKEND
+    storage.JSON_BACKEND = "json"
+    history = storage.load_json(history_file)
+    baseline_size = os.path.getsize(storage.find_data_file(history_file))
+
+    print(f"History: {history_file} ({len(history)} entries, {baseline_size} bytes)")
+    print(f"{'backend':<8} {'format':<14} {'save ms':>9} {'load ms':>9} {'bytes':>10}")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "price_history.json")
+            for backend in available_backends():
+                storage.JSON_BACKEND = backend
+                for label, compact, compression in available_formats():
+                    save_ms = best_of(
+                        lambda: storage.save_json(
+                            history, path, compact=compact, compression=compression
+                        ),
+                        repeat,
+                    )
+                    load_ms = best_of(lambda: storage.load_json(path), repeat)
+                    size = os.path.getsize(storage.data_file_path(path, compression))
+                    print(
+                        f"{backend:<8} {label:<14} {save_ms:>9.2f} {load_ms:>9.2f} {size:>10}"
+                    )
+    finally:
+        storage.JSON_BACKEND = original_backend
+
+
+if __name__ == "__main__":
+    run_benchmark(*sys.argv[1:2])
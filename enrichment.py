@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Enrich Spusu plans with details from their tariff detail pages.
+The listing API lacks contract terms, promo end dates and non-EU roaming, so
+detail pages are fetched concurrently over a shared session and the parsed
+results are kept in an on-disk TTL cache.
+"""
+
+import hashlib
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+import storage
+
+# Fields added to plan records by the enrichment stage
+ENRICHED_FIELDS = ("contract_term", "promo_end_date", "non_eu_roaming")
+
+CONTRACT_PATTERN = re.compile(
+    r"Mindestvertragsdauer|Mindestlaufzeit|Vertragsdauer|Vertragsbindung"
+    r"|Kündigungsfrist|kündbar",
+    re.IGNORECASE,
+)
+PROMO_END_PATTERN = re.compile(
+    r"(?:gültig|Aktion|Angebot|Promo)\D{0,40}?bis\s*(?:zum\s*|am\s*)?"
+    r"(\d{1,2})\.\s?(\d{1,2})\.\s?(\d{4})",
+    re.IGNORECASE,
+)
+NON_EU_ROAMING_PATTERN = re.compile(
+    r"Nicht-EU|ausserhalb (?:der )?EU|außerhalb (?:der )?EU|Weltzone|Roaming Welt",
+    re.IGNORECASE,
+)
+
+# Short label lines without an inline value are joined with the next line
+MAX_LABEL_LENGTH = 40
+
+
+def plan_fingerprint(plan: Dict[str, Any]) -> str:
+    """Hash the listing data of a plan, ignoring volatile and enriched fields"""
+    listing = {
+        key: value
+        for key, value in plan.items()
+        if key != "scraped_at" and key not in ENRICHED_FIELDS
+    }
+    encoded = json.dumps(listing, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def cache_key(plan: Dict[str, Any]) -> str:
+    """Build the cache key for a plan from its detail link and content hash"""
+    return f"{plan.get('url', '')}#{plan_fingerprint(plan)}"
+
+
+def _text_lines(response: requests.Response) -> List[str]:
+    """Extract the visible text of a detail page (HTML or JSON) as lines"""
+    content_type = response.headers.get("Content-Type", "")
+    if "json" in content_type:
+        lines = []
+
+        def collect(value):
+            if isinstance(value, dict):
+                for item in value.values():
+                    collect(item)
+            elif isinstance(value, list):
+                for item in value:
+                    collect(item)
+            elif isinstance(value, str):
+                lines.extend(value.splitlines())
+
+        collect(response.json())
+    else:
+        soup = BeautifulSoup(response.text, "lxml")
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+        lines = soup.get_text("\n").splitlines()
+
+    return [line.strip() for line in lines if line.strip()]
+
+
+def _find_line(lines: List[str], pattern: re.Pattern) -> Optional[str]:
+    """Return the first line matching a pattern, joined with its value line"""
+    for i, line in enumerate(lines):
+        if pattern.search(line):
+            is_label = len(line) <= MAX_LABEL_LENGTH and not re.search(r":\s*\S", line)
+            if is_label and i + 1 < len(lines):
+                return f"{line.rstrip(':')}: {lines[i + 1]}"
+            return line
+    return None
+
+
+def parse_details(lines: List[str]) -> Dict[str, Optional[str]]:
+    """Parse contract term, promo end date and non-EU roaming from page text"""
+    promo_end_date = None
+    for line in lines:
+        match = PROMO_END_PATTERN.search(line)
+        if match:
+            day, month, year = (int(part) for part in match.groups())
+            try:
+                promo_end_date = datetime(year, month, day).date().isoformat()
+            except ValueError:
+                continue
+            break
+
+    return {
+        "contract_term": _find_line(lines, CONTRACT_PATTERN),
+        "promo_end_date": promo_end_date,
+        "non_eu_roaming": _find_line(lines, NON_EU_ROAMING_PATTERN),
+    }
+
+
+class PlanEnricher:
+    def __init__(
+        self,
+        cache_file: str,
+        ttl: float = 7 * 24 * 3600,
+        max_workers: int = 4,
+        session: Optional[requests.Session] = None,
+        timeout: float = 30,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        if session is None:
+            session = requests.Session()
+            # One pooled connection per worker to the same host
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept": "text/html,application/json"})
+            session.headers.update(headers or {})
+        self.session = session
+
+    def load_cache(self) -> Dict[str, Dict]:
+        """Load the detail cache, dropping expired entries"""
+        try:
+            if not storage.find_data_file(self.cache_file):
+                return {}
+            cache = storage.load_json(self.cache_file)
+            if not isinstance(cache, dict):
+                raise ValueError("cache is not a JSON object")
+
+            now = time.time()
+            return {
+                key: entry
+                for key, entry in cache.items()
+                if isinstance(entry, dict)
+                and isinstance(entry.get("details"), dict)
+                and now - entry.get("fetched_at", 0) < self.ttl
+            }
+        except Exception as e:
+            print(f"Error loading detail cache: {e}")
+            return {}
+
+    def save_cache(self, new_entries: Dict[str, Dict]):
+        """Merge new entries into the on-disk cache"""
+        try:
+            with storage.file_lock(self.cache_file):
+                # Re-read under the lock to keep entries from concurrent runs
+                cache = self.load_cache()
+                cache.update(new_entries)
+                storage.save_json(cache, self.cache_file)
+        except Exception as e:
+            print(f"Error saving detail cache: {e}")
+
+    def fetch_details(self, url: str) -> Dict[str, Optional[str]]:
+        """Fetch and parse a single detail page"""
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_details(_text_lines(response))
+
+    def enrich(self, plans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge detail page information into plan records in place"""
+        cache = self.load_cache()
+        keys = {id(plan): cache_key(plan) for plan in plans}
+
+        to_fetch = {}
+        for plan in plans:
+            key = keys[id(plan)]
+            if key not in cache and plan.get("url"):
+                to_fetch.setdefault(key, plan["url"])
+
+        new_entries = {}
+        if to_fetch:
+            print(f"Fetching details for {len(to_fetch)} plans")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    key: executor.submit(self.fetch_details, url)
+                    for key, url in to_fetch.items()
+                }
+                for key, future in futures.items():
+                    try:
+                        new_entries[key] = {
+                            "fetched_at": time.time(),
+                            "details": future.result(),
+                        }
+                    except Exception as e:
+                        print(f"Error fetching details from {to_fetch[key]}: {e}")
+
+        if new_entries:
+            cache.update(new_entries)
+            self.save_cache(new_entries)
+
+        for plan in plans:
+            entry = cache.get(keys[id(plan)])
+            if entry:
+                plan.update(entry["details"])
+
+        return plans
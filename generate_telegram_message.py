@@ -3,17 +3,17 @@
 Generate detailed Telegram message for Spusu price changes
 """
 
-import json
 import sys
 from datetime import datetime
 import re
 
+import storage
+
 
 def load_current_prices():
     """Load current prices from JSON file"""
     try:
-        with open("data/spusu_prices.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+        return storage.load_json("data/spusu_prices.json")
     except:
         return None
 
@@ -4,20 +4,57 @@ Spusu Price Monitor
 Monitors mobile plan prices from spusu.ch and tracks price changes over time.
 """
 
-import json
 import requests
 from datetime import datetime
 import os
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+import storage
+from enrichment import PlanEnricher
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
 
 class SpusuPriceMonitor:
-    def __init__(self):
+    def __init__(
+        self,
+        compact: Optional[bool] = None,
+        compression: Optional[str] = None,
+        fsync: Optional[str] = None,
+        enrich: Optional[bool] = None,
+    ):
         self.base_url = "https://www.spusu.ch/de/tariffs"
         self.api_url = "https://www.spusu.ch/imoscmsapi/tariffs/mobile"
         self.data_dir = "data"
         self.price_history_file = os.path.join(self.data_dir, "price_history.json")
         self.current_prices_file = os.path.join(self.data_dir, "spusu_prices.json")
+        self.detail_cache_file = os.path.join(self.data_dir, "detail_cache.json")
+
+        # Output format: pretty-printed plain JSON unless configured otherwise
+        if compact is None:
+            compact = os.environ.get("SPUSU_DATA_COMPACT", "") == "1"
+        if compression is None:
+            compression = os.environ.get("SPUSU_DATA_COMPRESSION", "none").lower()
+        if compression not in storage.COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and storage.zstd is None:
+            raise ValueError(
+                "zstd compression requires the 'zstandard' package or Python 3.14+"
+            )
+        self.compact = compact
+        self.compression = compression
+
+        # Durability of atomic writes: "never", "file" (default) or "always"
+        if fsync is None:
+            fsync = os.environ.get("SPUSU_DATA_FSYNC", "file").lower()
+        if fsync not in storage.FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.fsync = fsync
+
+        # Optionally fetch tariff detail pages for extra plan information
+        if enrich is None:
+            enrich = os.environ.get("SPUSU_ENRICH", "") == "1"
+        self.enrich = enrich
 
         # Ensure data directory exists
         os.makedirs(self.data_dir, exist_ok=True)
@@ -125,7 +162,7 @@ class SpusuPriceMonitor:
         """Fetch current prices from the Spusu IMosCMS JSON API."""
         try:
             headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+                "User-Agent": USER_AGENT,
                 "Accept": "application/json",
             }
 
@@ -147,6 +184,19 @@ class SpusuPriceMonitor:
                         print(f"Error parsing plan: {e}")
                         continue
 
+            if self.enrich:
+                # Enrichment is optional: keep the plans without details if it fails
+                try:
+                    enricher = PlanEnricher(
+                        self.detail_cache_file, headers={"User-Agent": USER_AGENT}
+                    )
+                    # Plans without a tariffDetailLink only point at the listing
+                    enricher.enrich(
+                        [plan for plan in plans if plan["url"] != self.base_url]
+                    )
+                except Exception as e:
+                    print(f"Error enriching plans: {e}")
+
             return {
                 "timestamp": datetime.now().isoformat(),
                 "source_url": self.base_url,
@@ -174,31 +224,42 @@ class SpusuPriceMonitor:
             }
 
     def load_price_history(self) -> List[Dict]:
-        """Load existing price history"""
+        """Load existing price history (raises if the file is unreadable)"""
         try:
-            if os.path.exists(self.price_history_file):
-                with open(self.price_history_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
+            if storage.find_data_file(self.price_history_file):
+                return storage.load_json(self.price_history_file)
             return []
         except Exception as e:
             print(f"Error loading price history: {e}")
-            return []
+            raise
 
     def save_price_history(self, history: List[Dict]):
-        """Save price history to file"""
+        """Save price history to file (raises if the write fails)"""
         try:
-            with open(self.price_history_file, "w", encoding="utf-8") as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+            storage.save_json(
+                history,
+                self.price_history_file,
+                compact=self.compact,
+                compression=self.compression,
+                fsync=self.fsync,
+            )
         except Exception as e:
             print(f"Error saving price history: {e}")
+            raise
 
     def save_current_prices(self, current_data: Dict):
-        """Save current prices to file"""
+        """Save current prices to file (raises if the write fails)"""
         try:
-            with open(self.current_prices_file, "w", encoding="utf-8") as f:
-                json.dump(current_data, f, indent=2, ensure_ascii=False)
+            storage.save_json(
+                current_data,
+                self.current_prices_file,
+                compact=self.compact,
+                compression=self.compression,
+                fsync=self.fsync,
+            )
         except Exception as e:
             print(f"Error saving current prices: {e}")
+            raise
 
     def detect_price_changes(
         self, current_data: Dict, history: List[Dict]
@@ -262,65 +323,78 @@ class SpusuPriceMonitor:
 
         print(f"Found {current_data['total_plans']} plans")
 
-        # Load existing history
-        history = self.load_price_history()
+        # Hold the history lock for the whole read-modify-write cycle so that
+        # overlapping runs see each other's entries instead of racing
+        with storage.file_lock(self.price_history_file):
+            # Load existing history. An unreadable file must not be replaced by
+            # a fresh history, so fail the run instead of starting from scratch.
+            try:
+                history = self.load_price_history()
+            except Exception:
+                print("Aborting to avoid overwriting the existing price history")
+                raise
 
-        # Detect changes
-        changes = self.detect_price_changes(current_data, history)
+            # Detect changes
+            changes = self.detect_price_changes(current_data, history)
 
-        if changes:
-            print("Price changes detected:")
-            for change in changes:
-                if change["change"] == "NEW_PLAN":
-                    print(f"  NEW: {change['plan_name']} - CHF {change['new_price']}")
-                else:
-                    print(
-                        f"  CHANGE: {change['plan_name']} - CHF {change['old_price']} → CHF {change['new_price']} ({change['change']:+.2f})"
-                    )
-        else:
-            print("No price changes detected")
+            if changes:
+                print("Price changes detected:")
+                for change in changes:
+                    if change["change"] == "NEW_PLAN":
+                        print(
+                            f"  NEW: {change['plan_name']} - CHF {change['new_price']}"
+                        )
+                    else:
+                        print(
+                            f"  CHANGE: {change['plan_name']} - CHF {change['old_price']} → CHF {change['new_price']} ({change['change']:+.2f})"
+                        )
+            else:
+                print("No price changes detected")
 
-        # Add current data to history (only one entry per day)
-        current_data["price_changes"] = changes
-        today = datetime.now().date().isoformat()
+            # Add current data to history (only one entry per day)
+            current_data["price_changes"] = changes
+            today = datetime.now().date().isoformat()
 
-        # Check if there's already an entry for today
-        today_entry_index = -1
-        for i, entry in enumerate(history):
-            entry_date = datetime.fromisoformat(entry["timestamp"]).date().isoformat()
-            if entry_date == today:
-                today_entry_index = i
-                break
+            # Check if there's already an entry for today
+            today_entry_index = -1
+            for i, entry in enumerate(history):
+                entry_date = (
+                    datetime.fromisoformat(entry["timestamp"]).date().isoformat()
+                )
+                if entry_date == today:
+                    today_entry_index = i
+                    break
+
+            # Determine if we need to save files
+            should_save = False
+
+            if today_entry_index >= 0:
+                # There's already an entry for today
+                if changes:
+                    # Only update and save if there are changes
+                    print(f"Updating existing entry for {today} due to price changes")
+                    history[today_entry_index] = current_data
+                    should_save = True
+                else:
+                    print(f"No changes detected, skipping file update for {today}")
+            else:
+                # First run for today - always save
+                print(f"Adding new entry for {today}")
+                history.append(current_data)
+                should_save = True
 
-        # Determine if we need to save files
-        should_save = False
+            if should_save:
+                # Keep only last 2 years of entries to prevent file from growing too large
+                if len(history) > 365 * 2:
+                    history = history[-365 * 2 :]
 
-        if today_entry_index >= 0:
-            # There's already an entry for today
-            if changes:
-                # Only update and save if there are changes
-                print(f"Updating existing entry for {today} due to price changes")
-                history[today_entry_index] = current_data
-                should_save = True
+                # Save files. Errors propagate so current prices are never
+                # written without the matching history entry.
+                self.save_price_history(history)
+                self.save_current_prices(current_data)
+                print("Files saved successfully")
             else:
-                print(f"No changes detected, skipping file update for {today}")
-        else:
-            # First run for today - always save
-            print(f"Adding new entry for {today}")
-            history.append(current_data)
-            should_save = True
-
-        if should_save:
-            # Keep only last 2 years of entries to prevent file from growing too large
-            if len(history) > 365 * 2:
-                history = history[-365 * 2 :]
-
-            # Save files
-            self.save_price_history(history)
-            self.save_current_prices(current_data)
-            print("Files saved successfully")
-        else:
-            print("No file changes needed")
+                print("No file changes needed")
 
         print("Monitoring completed successfully")
 
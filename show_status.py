@@ -3,10 +3,10 @@
 Utility script to show current Spusu prices and history
 """
 
-import json
-import os
 from datetime import datetime
 
+import storage
+
 
 def show_status():
     """Show current prices and history summary"""
@@ -18,9 +18,8 @@ def show_status():
     print("=== SPUSU PRICE MONITOR STATUS ===\n")
 
     # Show current prices
-    if os.path.exists(current_file):
-        with open(current_file, "r", encoding="utf-8") as f:
-            current_data = json.load(f)
+    if storage.find_data_file(current_file):
+        current_data = storage.load_json(current_file)
 
         timestamp = current_data.get("timestamp", "Unknown")
         if timestamp != "Unknown":
@@ -54,6 +53,12 @@ def show_status():
                 print(f"   SMS: {sms}")
                 print(f"   EU Roaming: {eu_roaming}")
                 print(f"   EU Roaming Minutes: {eu_roaming_minutes}")
+                if plan.get("contract_term"):
+                    print(f"   Contract: {plan['contract_term']}")
+                if plan.get("promo_end_date"):
+                    print(f"   Promo ends: {plan['promo_end_date']}")
+                if plan.get("non_eu_roaming"):
+                    print(f"   Non-EU Roaming: {plan['non_eu_roaming']}")
                 print()
 
         # Show price changes
@@ -78,9 +83,8 @@ def show_status():
         print("❌ No current price data found. Run the monitor first.\n")
 
     # Show history summary
-    if os.path.exists(history_file):
-        with open(history_file, "r", encoding="utf-8") as f:
-            history = json.load(f)
+    if storage.find_data_file(history_file):
+        history = storage.load_json(history_file)
 
         print(f"📈 PRICE HISTORY SUMMARY")
         print(f"📅 Total monitoring days: {len(history)}")
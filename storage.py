@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+JSON storage helpers for the Spusu price data files.
+Picks the fastest available JSON codec (orjson, msgspec, stdlib json) and
+supports compact and gzip/zstd-compressed output with transparent detection
+on read. Writes are atomic (temp file + rename) and an advisory file lock
+guards read-modify-write cycles across concurrent monitor runs.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:  # pragma: no cover - optional dependency
+        zstd = None
+
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+elif msgspec is not None:
+    JSON_BACKEND = "msgspec"
+else:
+    JSON_BACKEND = "json"
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# "never": leave flushing to the OS, "file": fsync the data before renaming,
+# "always": additionally fsync the directory so the rename itself is durable
+FSYNC_POLICIES = ("never", "file", "always")
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def dumps(obj: Any, compact: bool = False) -> bytes:
+    """Serialize an object to UTF-8 JSON bytes"""
+    if JSON_BACKEND == "orjson":
+        return orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2)
+    if JSON_BACKEND == "msgspec":
+        data = msgspec.json.encode(obj)
+        return data if compact else msgspec.json.format(data, indent=2)
+    if compact:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(obj, indent=2, ensure_ascii=False)
+    return text.encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Deserialize UTF-8 JSON bytes"""
+    if JSON_BACKEND == "orjson":
+        return orjson.loads(data)
+    if JSON_BACKEND == "msgspec":
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def detect_compression(data: bytes) -> str:
+    """Detect the compression of raw file contents from their magic bytes"""
+    if data.startswith(GZIP_MAGIC):
+        return "gzip"
+    if data.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return "none"
+
+
+def _require_zstd():
+    if zstd is None:
+        raise RuntimeError("zstd compression requires the 'zstandard' package")
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    """Compress bytes with the given method ("none", "gzip" or "zstd")"""
+    if compression == "none":
+        return data
+    if compression == "gzip":
+        # mtime=0 keeps the output reproducible across runs
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if compression == "zstd":
+        _require_zstd()
+        return zstd.compress(data, 9)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompress bytes, detecting the method from their magic bytes"""
+    compression = detect_compression(data)
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        _require_zstd()
+        if zstd.__name__ == "zstandard":
+            # zstandard needs a streaming reader when the frame has no size
+            with zstd.ZstdDecompressor().stream_reader(data) as reader:
+                return reader.read()
+        return zstd.decompress(data)
+    return data
+
+
+def data_file_path(path: str, compression: str = "none") -> str:
+    """Return the on-disk path for a JSON file written with a compression"""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+    return path + COMPRESSION_SUFFIXES.get(compression, "")
+
+
+def find_data_file(path: str) -> Optional[str]:
+    """Find the newest existing variant of a JSON file (plain, .gz or .zst)"""
+    candidates = [path] + [path + suffix for suffix in COMPRESSION_SUFFIXES.values()]
+    existing = [p for p in candidates if os.path.exists(p)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+
+def load_json(path: str) -> Any:
+    """Load a JSON file, transparently handling compressed variants"""
+    actual_path = find_data_file(path)
+    if actual_path is None:
+        raise FileNotFoundError(path)
+    with open(actual_path, "rb") as f:
+        return loads(decompress(f.read()))
+
+
+def _current_umask() -> int:
+    # os.umask can only be read by setting it, so restore it right away
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _fsync_directory(directory: str):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - directories can't be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, data: bytes, fsync: str = "file"):
+    """Write bytes to a file atomically via a temp file and rename"""
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {fsync}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync != "never":
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstemp creates the file as 0600; keep the permissions of the target,
+        # or the umask default for new files
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~_current_umask()
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if fsync == "always":
+        _fsync_directory(directory)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive advisory lock on a JSON file (no-op without fcntl)"""
+    with open(path + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def save_json(
+    obj: Any,
+    path: str,
+    compact: bool = False,
+    compression: str = "none",
+    fsync: str = "file",
+) -> str:
+    """Save an object as JSON atomically, returning the path actually written"""
+    actual_path = data_file_path(path, compression)
+    data = compress(dumps(obj, compact=compact), compression)
+    atomic_write(actual_path, data, fsync=fsync)
+
+    # Drop variants in other formats so readers never pick up stale data
+    for other in (path, *(path + s for s in COMPRESSION_SUFFIXES.values())):
+        if other != actual_path and os.path.exists(other):
+            os.remove(other)
+
+    return actual_path
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Send the Spusu price alert to one or more Telegram chats.
+Messages go out concurrently over one pooled connection, throttled by token
+buckets matching Telegram's per-chat and global limits, with retries on 429.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TELEGRAM_API_BASE = "https://api.telegram.org"
+MAX_MESSAGE_LENGTH = 4096
+
+# Telegram allows ~30 messages/second overall, 1/second per chat and
+# 20/minute per group or channel
+GLOBAL_RATE = 30.0
+PRIVATE_CHAT_RATE = 1.0
+GROUP_CHAT_RATE = 20 / 60
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                # Tolerate float rounding so a wait never shrinks below the
+                # clock's resolution
+                if self.tokens >= 1 - 1e-9:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Split a message into chunks within Telegram's length limit"""
+    if len(text) <= limit:
+        return [text]
+
+    # Prefer splitting between paragraphs so Markdown entities stay intact
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        while len(paragraph) > limit:
+            cut = paragraph.rfind("\n", 0, limit)
+            if cut <= 0:
+                cut = limit
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip("\n")
+
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = candidate
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def parse_chat_ids(value: str) -> List[str]:
+    """Parse a comma or whitespace separated list of chat IDs"""
+    return [chat_id for chat_id in re.split(r"[,\s]+", value) if chat_id]
+
+
+def is_group_chat(chat_id: str) -> bool:
+    """Groups and channels have negative IDs or are addressed as @username"""
+    return chat_id.startswith(("-", "@"))
+
+
+class TelegramNotifier:
+    def __init__(
+        self,
+        token: str,
+        chat_ids: List[str],
+        api_base: str = TELEGRAM_API_BASE,
+        max_workers: int = 8,
+        max_retries: int = 3,
+        session: Optional[requests.Session] = None,
+        timeout: float = 30,
+        global_rate: float = GLOBAL_RATE,
+        private_chat_rate: float = PRIVATE_CHAT_RATE,
+        group_chat_rate: float = GROUP_CHAT_RATE,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.token = token
+        self.chat_ids = list(dict.fromkeys(chat_ids))
+        self.api_url = f"{api_base.rstrip('/')}/bot{token}/sendMessage"
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.clock = clock
+        self.sleep = sleep
+
+        if session is None:
+            session = requests.Session()
+            # All requests go to the same host; share one pool across workers
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+        # Capacity 1 spaces messages evenly instead of allowing bursts
+        self.global_bucket = TokenBucket(global_rate, clock=clock, sleep=sleep)
+        self.chat_buckets = {
+            chat_id: TokenBucket(
+                group_chat_rate if is_group_chat(chat_id) else private_chat_rate,
+                clock=clock,
+                sleep=sleep,
+            )
+            for chat_id in self.chat_ids
+        }
+
+    def _redact(self, text: str) -> str:
+        """Hide the bot token in error messages"""
+        return text.replace(self.token, "***") if self.token else text
+
+    def send_message(self, chat_id: str, text: str) -> Dict[str, Any]:
+        """Send one message to one chat, retrying on 429 and server errors"""
+        payload = {
+            "chat_id": chat_id,
+            "text": text,
+            "parse_mode": "Markdown",
+            "disable_web_page_preview": True,
+        }
+        retries = 0
+        error = None
+
+        for attempt in range(self.max_retries + 1):
+            self.chat_buckets[chat_id].acquire()
+            self.global_bucket.acquire()
+
+            delay = 2**attempt
+            try:
+                response = self.session.post(
+                    self.api_url, json=payload, timeout=self.timeout
+                )
+                if response.status_code == 200:
+                    return {"ok": True, "retries": retries, "error": None}
+
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = {}
+                error = body.get("description") or f"HTTP {response.status_code}"
+
+                if response.status_code == 429:
+                    delay = body.get("parameters", {}).get("retry_after", delay)
+                elif response.status_code < 500:
+                    # Bad request, blocked bot, unknown chat: retrying won't help
+                    break
+            except requests.RequestException as e:
+                error = self._redact(str(e))
+
+            if attempt < self.max_retries:
+                retries += 1
+                self.sleep(delay)
+
+        return {"ok": False, "retries": retries, "error": error}
+
+    def _send_to_chat(self, chat_id: str, chunks: List[str]) -> Dict[str, Any]:
+        """Send all chunks to one chat in order, stopping at the first failure"""
+        result = {"chat_id": chat_id, "sent": 0, "retries": 0, "error": None}
+        for chunk in chunks:
+            outcome = self.send_message(chat_id, chunk)
+            result["retries"] += outcome["retries"]
+            if not outcome["ok"]:
+                result["error"] = outcome["error"]
+                break
+            result["sent"] += 1
+        return result
+
+    def broadcast(self, text: str) -> Dict[str, Any]:
+        """Send a message to all chats concurrently and return delivery stats"""
+        chunks = split_message(text)
+        start = self.clock()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(
+                executor.map(
+                    lambda chat_id: self._send_to_chat(chat_id, chunks),
+                    self.chat_ids,
+                )
+            )
+
+        failed = {r["chat_id"]: r["error"] for r in results if r["error"]}
+        return {
+            "chats": len(self.chat_ids),
+            "delivered": len(self.chat_ids) - len(failed),
+            "failed": failed,
+            "messages_sent": sum(r["sent"] for r in results),
+            "retries": sum(r["retries"] for r in results),
+            "duration_seconds": round(self.clock() - start, 3),
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(
+            "Usage: python telegram_notifier.py <telegram_message_file>",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+    chat_ids = parse_chat_ids(os.environ.get("TELEGRAM_CHAT_ID", ""))
+    if not token or not chat_ids:
+        print("TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID must be set", file=sys.stderr)
+        sys.exit(1)
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        message = f.read().strip()
+
+    notifier = TelegramNotifier(
+        token,
+        chat_ids,
+        api_base=os.environ.get("TELEGRAM_API_BASE", TELEGRAM_API_BASE),
+    )
+    stats = notifier.broadcast(message)
+
+    print(
+        f"📱 Delivered to {stats['delivered']}/{stats['chats']} chats "
+        f"({stats['messages_sent']} messages, {stats['retries']} retries, "
+        f"{stats['duration_seconds']}s)"
+    )
+    # Individual chat IDs are not masked in CI logs, so report positions only
+    for position, chat_id in enumerate(notifier.chat_ids, start=1):
+        if chat_id in stats["failed"]:
+            error = stats["failed"][chat_id]
+            print(f"  Failed: chat #{position}: {error}", file=sys.stderr)
+
+    if stats["failed"]:
+        sys.exit(1)
@@ -0,0 +1,119 @@
+"""
+Offline tests for the plan enrichment stage using fixture responses
+"""
+
+import json
+import os
+
+import pytest
+
+import enrichment
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class FakeResponse:
+    def __init__(self, text, content_type):
+        self.text = text
+        self.headers = {"Content-Type": content_type}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Serve fixture files by the last path segment of the requested URL"""
+
+    fixtures = {
+        "spusu10": ("tariff_detail.html", "text/html; charset=utf-8"),
+        "spusu15": ("tariff_detail.json", "application/json"),
+    }
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, timeout):
+        self.requested.append(url)
+        filename, content_type = self.fixtures[url.rsplit("/", 1)[-1]]
+        with open(os.path.join(FIXTURES_DIR, filename), encoding="utf-8") as f:
+            return FakeResponse(f.read(), content_type)
+
+
+def make_plans(price=9.9):
+    return [
+        {
+            "name": "spusu 10",
+            "price_chf": price,
+            "url": "https://www.spusu.ch/de/tariffs/spusu10",
+            "scraped_at": "2026-10-19T08:00:00",
+        },
+        {
+            "name": "spusu 15",
+            "price_chf": 14.9,
+            "url": "https://www.spusu.ch/de/tariffs/spusu15",
+            "scraped_at": "2026-10-19T08:00:00",
+        },
+    ]
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / "detail_cache.json")
+
+
+def test_extracts_fields_from_html_and_json(cache_file):
+    plans = make_plans()
+    enrichment.PlanEnricher(cache_file, session=FakeSession()).enrich(plans)
+
+    assert plans[0]["contract_term"] == "Mindestvertragsdauer: keine, monatlich kündbar"
+    assert plans[0]["promo_end_date"] == "2026-12-31"
+    assert plans[0]["non_eu_roaming"] == "Roaming ausserhalb EU: CHF 0.50/MB"
+
+    # Inline "label: value" lines are not joined with the following line
+    assert plans[1]["contract_term"] == "Vertragsbindung: 12 Monate"
+    assert plans[1]["promo_end_date"] == "2027-02-01"
+    assert plans[1]["non_eu_roaming"] == "Weltzone 1: CHF 1.00/MB"
+
+
+def test_unchanged_plans_are_served_from_cache(cache_file):
+    enrichment.PlanEnricher(cache_file, session=FakeSession()).enrich(make_plans())
+
+    session = FakeSession()
+    plans = make_plans()
+    # A new scrape timestamp alone must not invalidate the cache
+    for plan in plans:
+        plan["scraped_at"] = "2026-10-20T08:00:00"
+    enrichment.PlanEnricher(cache_file, session=session).enrich(plans)
+
+    assert session.requested == []
+    assert plans[0]["promo_end_date"] == "2026-12-31"
+
+
+def test_changed_plan_is_refetched(cache_file):
+    enrichment.PlanEnricher(cache_file, session=FakeSession()).enrich(make_plans())
+
+    session = FakeSession()
+    plans = make_plans(price=10.9)
+    enrichment.PlanEnricher(cache_file, session=session).enrich(plans)
+
+    assert session.requested == ["https://www.spusu.ch/de/tariffs/spusu10"]
+    assert plans[0]["contract_term"] == "Mindestvertragsdauer: keine, monatlich kündbar"
+
+
+@pytest.mark.parametrize(
+    "cache_contents",
+    ["[]", '{"key": []}', '{"key": {"fetched_at": "yesterday"}}', "not json"],
+)
+def test_malformed_cache_is_ignored(cache_file, cache_contents):
+    with open(cache_file, "w", encoding="utf-8") as f:
+        f.write(cache_contents)
+
+    session = FakeSession()
+    plans = make_plans()
+    enrichment.PlanEnricher(cache_file, session=session).enrich(plans)
+
+    assert len(session.requested) == 2
+    assert plans[0]["promo_end_date"] == "2026-12-31"
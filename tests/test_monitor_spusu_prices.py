@@ -0,0 +1,96 @@
+"""
+Tests for history handling in the price monitor
+"""
+
+import os
+
+import pytest
+
+import monitor_spusu_prices
+
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monitor = monitor_spusu_prices.SpusuPriceMonitor(compression="none")
+    monitor.scrape_prices = lambda: {
+        "timestamp": "2026-10-19T08:00:00",
+        "source_url": monitor.base_url,
+        "plans": [{"name": "spusu 10", "price_chf": 9.9}],
+        "total_plans": 1,
+    }
+    return monitor
+
+
+def test_truncated_history_fails_the_run_without_rewriting(monitor):
+    truncated = b'[\n  {\n    "timestamp": "2026-10-18T08:00:00",\n    "pla'
+    with open(monitor.price_history_file, "wb") as f:
+        f.write(truncated)
+
+    with pytest.raises(Exception):
+        monitor.run_monitoring()
+
+    with open(monitor.price_history_file, "rb") as f:
+        assert f.read() == truncated
+    assert not os.path.exists(monitor.current_prices_file)
+
+
+def test_failed_history_write_skips_current_prices(monitor, monkeypatch):
+    def fail_write(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(monitor_spusu_prices.storage, "atomic_write", fail_write)
+
+    with pytest.raises(OSError):
+        monitor.run_monitoring()
+
+    assert not os.path.exists(monitor.current_prices_file)
+
+
+def test_run_appends_history_entry(monitor):
+    monitor.run_monitoring()
+
+    history = monitor.load_price_history()
+    assert len(history) == 1
+    assert history[0]["plans"][0]["name"] == "spusu 10"
+
+
+class FakeListingResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            "groups": [
+                {
+                    "saleItems": [
+                        {
+                            "tariffDetailLink": "spusu10",
+                            "tariffModel": {
+                                "tariffModelName": "spusu 10",
+                                "fees": {"contractFee": {"amount": 9.9}},
+                            },
+                        }
+                    ]
+                }
+            ]
+        }
+
+
+def test_enrichment_failure_keeps_scraped_plans(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        monitor_spusu_prices.requests,
+        "get",
+        lambda *args, **kwargs: FakeListingResponse(),
+    )
+
+    def fail_enrich(self, plans):
+        raise RuntimeError("detail pages unavailable")
+
+    monkeypatch.setattr(monitor_spusu_prices.PlanEnricher, "enrich", fail_enrich)
+
+    data = monitor_spusu_prices.SpusuPriceMonitor(enrich=True).scrape_prices()
+
+    assert "error" not in data
+    assert [plan["name"] for plan in data["plans"]] == ["spusu 10"]
@@ -0,0 +1,158 @@
+"""
+Tests for the JSON storage helpers
+"""
+
+import json
+import os
+
+import pytest
+
+import storage
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = [
+    {
+        "timestamp": "2026-10-19T08:00:00.123456",
+        "plans": [
+            {
+                "name": "spusu legendär XL",
+                "price_chf": 22.9,
+                "price_per_extra_gb": None,
+                "minutes": "unlimited",
+                "description": "20 GB EU Roaming | CHF 22.90 – mtl.",
+            }
+        ],
+        "total_plans": 1,
+        "price_changes": [],
+    }
+]
+
+BACKENDS = [
+    backend
+    for backend, module in (
+        ("json", json),
+        ("msgspec", storage.msgspec),
+        ("orjson", storage.orjson),
+    )
+    if module is not None
+]
+
+COMPRESSIONS = [
+    compression
+    for compression in storage.COMPRESSIONS
+    if compression != "zstd" or storage.zstd is not None
+]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+    monkeypatch.setattr(storage, "JSON_BACKEND", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_round_trip(tmp_path, backend, compression, compact):
+    path = str(tmp_path / "history.json")
+
+    written = storage.save_json(SAMPLE, path, compact=compact, compression=compression)
+
+    assert written == storage.data_file_path(path, compression)
+    with open(written, "rb") as f:
+        assert storage.detect_compression(f.read()) == compression
+    assert storage.load_json(path) == SAMPLE
+
+
+def test_pretty_output_matches_stdlib(backend):
+    with open(os.path.join(REPO_DIR, "data", "price_history.json"), "rb") as f:
+        committed = f.read()
+    history = json.loads(committed)
+
+    for obj in (SAMPLE, history):
+        expected = json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+        assert storage.dumps(obj) == expected
+    assert storage.dumps(history) == committed
+
+
+def test_detect_compression():
+    assert storage.detect_compression(b"\x1f\x8b\x08\x00") == "gzip"
+    assert storage.detect_compression(b"\x28\xb5\x2f\xfd\x00") == "zstd"
+    assert storage.detect_compression(b'[{"a": 1}]') == "none"
+    assert storage.detect_compression(b"") == "none"
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        storage.save_json(SAMPLE, str(tmp_path / "h.json"), compression="bz2")
+
+
+@pytest.mark.skipif(storage.zstd is not None, reason="zstd codec installed")
+def test_zstd_without_codec_raises(tmp_path):
+    with pytest.raises(RuntimeError):
+        storage.save_json(SAMPLE, str(tmp_path / "h.json"), compression="zstd")
+
+
+def test_format_switch_removes_other_variants(tmp_path):
+    path = str(tmp_path / "history.json")
+    storage.save_json(SAMPLE, path)
+
+    assert storage.find_data_file(path) == path
+
+    storage.save_json(SAMPLE, path, compression="gzip")
+
+    assert sorted(os.listdir(tmp_path)) == ["history.json.gz"]
+    assert storage.find_data_file(path) == path + ".gz"
+    assert storage.load_json(path) == SAMPLE
+
+    storage.save_json(SAMPLE, path)
+
+    assert sorted(os.listdir(tmp_path)) == ["history.json"]
+
+
+def test_find_data_file_missing(tmp_path):
+    path = str(tmp_path / "missing.json")
+
+    assert storage.find_data_file(path) is None
+    with pytest.raises(FileNotFoundError):
+        storage.load_json(path)
+
+
+def test_failed_write_keeps_original_and_removes_temp_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "history.json")
+    storage.save_json(SAMPLE, path)
+    with open(path, "rb") as f:
+        original = f.read()
+
+    def fail_replace(src, dst):
+        raise OSError("simulated crash during rename")
+
+    monkeypatch.setattr(storage.os, "replace", fail_replace)
+
+    with pytest.raises(OSError):
+        storage.save_json([{"timestamp": "new"}], path)
+
+    assert os.listdir(tmp_path) == ["history.json"]
+    with open(path, "rb") as f:
+        assert f.read() == original
+
+
+def test_new_files_follow_umask(tmp_path):
+    path = str(tmp_path / "history.json")
+    old_mask = os.umask(0o027)
+    try:
+        storage.save_json(SAMPLE, path)
+    finally:
+        os.umask(old_mask)
+
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+
+def test_existing_file_permissions_are_kept(tmp_path):
+    path = str(tmp_path / "history.json")
+    storage.save_json(SAMPLE, path)
+    os.chmod(path, 0o600)
+
+    storage.save_json([], path)
+
+    assert os.stat(path).st_mode & 0o777 == 0o600
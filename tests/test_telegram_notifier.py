@@ -0,0 +1,273 @@
+"""
+Tests for the Telegram notifier against a local fake Bot API server
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import telegram_notifier
+
+
+class FakeBotAPI(ThreadingHTTPServer):
+    """Minimal sendMessage endpoint replaying scripted responses per chat"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeBotAPIHandler)
+        self.scripts = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def next_response(self, chat_id):
+        with self.lock:
+            script = self.scripts.get(chat_id, [])
+            if script:
+                return script.pop(0)
+        return 200, {"ok": True, "result": {}}
+
+
+class FakeBotAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        payload = json.loads(self.rfile.read(length))
+        with self.server.lock:
+            self.server.requests.append((self.path, payload))
+
+        status, body = self.server.next_response(payload["chat_id"])
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def bot_api():
+    server = FakeBotAPI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    """Monotonic clock that only advances when something sleeps"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self.lock = threading.Lock()
+
+    def monotonic(self):
+        with self.lock:
+            return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+class RecordingSession:
+    """Session stub recording the fake time of every sendMessage call"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = []
+
+    def post(self, url, json, timeout):
+        self.sent.append((json["chat_id"], self.clock.monotonic()))
+        return FakeResponse()
+
+
+class FakeResponse:
+    status_code = 200
+
+    def json(self):
+        return {"ok": True, "result": {}}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_notifier(bot_api, chat_ids, clock):
+    return telegram_notifier.TelegramNotifier(
+        "TOKEN",
+        chat_ids,
+        api_base=bot_api.url,
+        clock=clock.monotonic,
+        sleep=clock.sleep,
+    )
+
+
+def test_429_is_retried_after_retry_after(bot_api, clock):
+    bot_api.scripts["1"] = [
+        (
+            429,
+            {
+                "ok": False,
+                "description": "Too Many Requests: retry after 7",
+                "parameters": {"retry_after": 7},
+            },
+        )
+    ]
+
+    stats = make_notifier(bot_api, ["1"], clock).broadcast("hello")
+
+    assert stats["delivered"] == 1
+    assert stats["retries"] == 1
+    assert clock.sleeps == [7]
+    assert len(bot_api.requests) == 2
+    assert bot_api.requests[0][0] == "/botTOKEN/sendMessage"
+
+
+def test_400_fails_without_retry(bot_api, clock):
+    bot_api.scripts["1"] = [
+        (400, {"ok": False, "description": "Bad Request: chat not found"})
+    ]
+
+    stats = make_notifier(bot_api, ["1", "2"], clock).broadcast("hello")
+
+    assert stats["delivered"] == 1
+    assert stats["failed"] == {"1": "Bad Request: chat not found"}
+    assert stats["retries"] == 0
+    # The only wait is the global rate limit spacing the two chats
+    assert clock.sleeps == [pytest.approx(1 / telegram_notifier.GLOBAL_RATE)]
+    assert [p["chat_id"] for _, p in bot_api.requests].count("1") == 1
+
+
+def test_server_errors_back_off_exponentially(bot_api, clock):
+    error = (502, {"ok": False, "description": "Bad Gateway"})
+    bot_api.scripts["1"] = [error, error, error]
+
+    stats = make_notifier(bot_api, ["1"], clock).broadcast("hello")
+
+    assert stats["delivered"] == 1
+    assert stats["retries"] == 3
+    assert clock.sleeps == [1, 2, 4]
+
+
+def test_long_messages_are_split_between_paragraphs(bot_api, clock):
+    paragraphs = [f"*Plan {i}*\n" + "x" * 1000 for i in range(10)]
+    text = "\n\n".join(paragraphs)
+
+    chunks = telegram_notifier.split_message(text)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= telegram_notifier.MAX_MESSAGE_LENGTH for chunk in chunks)
+    assert "\n\n".join(chunks) == text
+    assert all(chunk.startswith("*Plan") for chunk in chunks)
+
+    stats = make_notifier(bot_api, ["1", "@channel"], clock).broadcast(text)
+
+    assert stats["messages_sent"] == 2 * len(chunks)
+    sent = [p["text"] for _, p in bot_api.requests if p["chat_id"] == "@channel"]
+    assert sent == chunks
+
+
+def test_group_and_channel_chats_use_group_rate(clock):
+    notifier = telegram_notifier.TelegramNotifier(
+        "TOKEN", ["123456789", "-100123456789", "@x"], clock=clock.monotonic
+    )
+
+    rates = {chat_id: bucket.rate for chat_id, bucket in notifier.chat_buckets.items()}
+    assert rates == {
+        "123456789": telegram_notifier.PRIVATE_CHAT_RATE,
+        "-100123456789": telegram_notifier.GROUP_CHAT_RATE,
+        "@x": telegram_notifier.GROUP_CHAT_RATE,
+    }
+
+
+@pytest.mark.parametrize(
+    "chat_id, spacing", [("123456789", 1.0), ("-100123456789", 3.0), ("@x", 3.0)]
+)
+def test_sends_to_one_chat_are_spaced_by_its_rate(clock, chat_id, spacing):
+    session = RecordingSession(clock)
+    notifier = telegram_notifier.TelegramNotifier(
+        "TOKEN", [chat_id], session=session, clock=clock.monotonic, sleep=clock.sleep
+    )
+
+    for _ in range(3):
+        assert notifier.send_message(chat_id, "hello")["ok"]
+
+    times = [t for _, t in session.sent]
+    assert times[1] - times[0] == pytest.approx(spacing)
+    assert times[2] - times[1] == pytest.approx(spacing)
+
+
+def test_global_rate_caps_sends_across_chats(clock):
+    chat_ids = [str(i) for i in range(1, 91)]
+    session = RecordingSession(clock)
+    notifier = telegram_notifier.TelegramNotifier(
+        "TOKEN", chat_ids, session=session, clock=clock.monotonic, sleep=clock.sleep
+    )
+
+    for chat_id in chat_ids:
+        assert notifier.send_message(chat_id, "hello")["ok"]
+
+    times = [t for _, t in session.sent]
+    # 90 messages at 30/s take 89/30 seconds, and no one-second window
+    # holds more than 30 of them
+    assert times[-1] - times[0] == pytest.approx(89 / 30)
+    for i, start in enumerate(times):
+        in_window = [t for t in times[i:] if t < start + 1 - 1e-9]
+        assert len(in_window) <= telegram_notifier.GLOBAL_RATE
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = telegram_notifier.TokenBucket(
+        2.0, capacity=2, clock=clock.monotonic, sleep=clock.sleep
+    )
+
+    times = []
+    for _ in range(4):
+        bucket.acquire()
+        times.append(clock.monotonic())
+
+    assert times[:2] == [1000.0, 1000.0]
+    assert times[2] == pytest.approx(1000.5)
+    assert times[3] == pytest.approx(1001.0)
+
+
+def test_cli_does_not_print_chat_ids(bot_api, tmp_path):
+    bot_api.scripts["-100987654321"] = [
+        (400, {"ok": False, "description": "Bad Request: chat not found"})
+    ]
+    message_file = tmp_path / "telegram_message.txt"
+    message_file.write_text("hello", encoding="utf-8")
+
+    result = subprocess.run(
+        [sys.executable, telegram_notifier.__file__, str(message_file)],
+        capture_output=True,
+        text=True,
+        env={
+            **os.environ,
+            "TELEGRAM_BOT_TOKEN": "TOKEN",
+            "TELEGRAM_CHAT_ID": "123456789,-100987654321",
+            "TELEGRAM_API_BASE": bot_api.url,
+        },
+    )
+
+    assert result.returncode == 1
+    assert "Failed: chat #2: Bad Request: chat not found" in result.stderr
+    output = result.stdout + result.stderr
+    assert "123456789" not in output
+    assert "-100987654321" not in output